@@ -0,0 +1,49 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+@dataclass(slots=True)
+class CacheEntry:
+    value: Any = None
+    stored_at: float = 0.0  # time.monotonic() of the last computation; 0.0 means never computed
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+class TTLCache:
+    """Async results kept per key for `ttl` seconds.
+
+    Each entry owns its lock, so a burst of misses on one key runs a single computation and the
+    rest wait for its result. Past `max_keys`, the least recently used entry is evicted together
+    with its lock.
+    """
+
+    def __init__(self, ttl: float, max_keys: int = 64):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def _entry(self, key: Hashable) -> CacheEntry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = CacheEntry()
+            if len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _fresh(self, entry: CacheEntry) -> bool:
+        return entry.stored_at > 0.0 and time.monotonic() - entry.stored_at < self.ttl
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]], force: bool = False) -> Any:
+        """Return the cached value for key, running compute() when it is missing, stale or forced."""
+        entry = self._entry(key)
+        if not force and self._fresh(entry):
+            return entry.value
+        async with entry.lock:
+            if not force and self._fresh(entry):
+                return entry.value
+            entry.value = await compute()
+            entry.stored_at = time.monotonic()
+        return entry.value
@@ -1,27 +1,46 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from functools import lru_cache
 import logging
 
 class Settings(BaseSettings):
     # The model_config replaces the Config class in Pydantic v2
     model_config = SettingsConfigDict(
         env_file=".env",
-        case_sensitive=True
+        case_sensitive=False,
+        populate_by_name=True
     )
 
     # OpenAI Settings
-    OPENAI_API_KEY: str
+    openai_api_key: str = Field(..., alias="OPENAI_API_KEY")
     model_name: str = "gpt-4-turbo-preview"
     environment: str = "development"
     
     # MongoDB Settings
-    MONGODB_URL: str
-    MONGODB_DB_NAME: str = "rinova"  # Changed to match the case in your code
+    mongodb_url: str = Field(..., alias="MONGODB_URL")
+    mongodb_db_name: str = Field(default="rinova", alias="MONGODB_DB_NAME")
+    mongo_max_pool: int = 50
+    mongo_min_pool: int = 10
+    mongo_max_connecting: int = 4
     
     # API Settings
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    cors_origins: str = "https://rinova.netlify.app,https://rinova-dev.netlify.app,http://localhost:3000,http://localhost:5173"
+    
+    # Rate Limiting Settings; use redis://host:6379/0 so all workers share one counter store
+    rate_limit_store: str = "memory://"
+    health_rate_limit: str = "5/minute"
+    
+    # Health Check Settings
+    health_cache_ttl: int = 300  # seconds
+    openai_healthcheck_timeout: float = 5.0  # seconds
+    
+    # Analytics Settings
+    analytics_cache_ttl: int = 60  # seconds; per-process cache of /analytics/extraction-stats
+    
+    # Retention Settings; 0 disables the created_at TTL index on medical_notes
+    notes_retention_days: int = 0
     
     # Logging Settings
     log_level: str = "INFO"
@@ -31,21 +50,32 @@ class Settings(BaseSettings):
     max_concurrent_extractions: int = 10
     extraction_timeout: int = 30  # seconds
 
-@lru_cache()
-def get_settings():
-    return Settings()
+# Instantiate settings once at import; get_settings() is a plain attribute load
+SETTINGS = Settings()
+
+def get_settings() -> Settings:
+    return SETTINGS
+
+settings = SETTINGS
 
-# Instantiate settings
-settings = get_settings()
+# Resolve the level and build the formatter once instead of on every setup call
+LOG_LEVEL = getattr(logging, SETTINGS.log_level.upper())
+LOG_FORMATTER = logging.Formatter(SETTINGS.log_format)
 
 # Logging configuration function
-def setup_logging(settings: Settings = get_settings()):
-    logging_level = getattr(logging, settings.log_level.upper())
+def setup_logging(settings: Settings = SETTINGS):
+    if settings is SETTINGS:
+        logging_level, formatter = LOG_LEVEL, LOG_FORMATTER
+    else:
+        logging_level = getattr(logging, settings.log_level.upper())
+        formatter = logging.Formatter(settings.log_format)
+    handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
     logging.basicConfig(
         level=logging_level,
-        format=settings.log_format
+        handlers=[handler]
     )
-    return logging.getLogger(settings.MONGODB_DB_NAME)
+    return logging.getLogger(settings.mongodb_db_name)
 
 # Initialize logger
 logger = setup_logging()
@@ -0,0 +1,138 @@
+import logging
+from typing import List
+
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Index definitions shared by the app lifespan and /admin/maintenance/optimize
+
+def medical_notes_indexes() -> List[IndexModel]:
+    """The medical_notes indexes, including the opt-in TTL retention index."""
+    indexes = [
+        IndexModel([("date", DESCENDING)], name="date_-1"),
+        IndexModel([("doctor_name", ASCENDING)], name="doctor_name_1"),
+        IndexModel([("patient_name", ASCENDING)], name="patient_name_1"),
+        IndexModel([("note_text", TEXT)], name="note_text_text"),
+        # Serves status-only lookups and status filters sorted/ranged on created_at
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_1_created_at_-1"),
+        # created_at ranges for the admin stats window counts, plus the sort and keyset range of /search/notes
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_-1__id_-1"),
+        # One wildcard index over the three parallel code arrays instead of three multikey indexes
+        IndexModel(
+            [("$**", ASCENDING)],
+            name="extraction_codes_wildcard",
+            wildcardProjection={
+                "extraction_result.icd10_codes.code": 1,
+                "extraction_result.cpt_codes.code": 1,
+                "extraction_result.hcpcs_codes.code": 1
+            }
+        )
+    ]
+
+    # Opt-in retention so the collection (and the scans over it) stays bounded
+    if settings.notes_retention_days > 0:
+        indexes.append(IndexModel(
+            [("created_at", ASCENDING)],
+            name="ttl_created_at",
+            expireAfterSeconds=settings.notes_retention_days * 24 * 60 * 60
+        ))
+    return indexes
+
+# Indexes earlier builds created that the sets above replace; they only cost writes now
+SUPERSEDED_INDEXES = {
+    "medical_notes": (
+        # Replaced by extraction_codes_wildcard
+        "extraction_result.icd10_codes.code_1",
+        "extraction_result.cpt_codes.code_1",
+        "extraction_result.hcpcs_codes.code_1",
+        # Prefixes of status_1_created_at_-1 and created_at_-1__id_-1
+        "status_1",
+        "created_at_-1",
+    ),
+    "extraction_results": (
+        "extraction_stats_cov",
+        "analytics_stats_cov",
+        "created_at_-1__id_-1",
+    ),
+}
+
+async def drop_superseded_indexes(database) -> List[str]:
+    """Drop the SUPERSEDED_INDEXES still present; returns the names dropped."""
+    dropped = []
+    for collection_name, names in SUPERSEDED_INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            try:
+                await collection.drop_index(name)
+            except OperationFailure as e:
+                # IndexNotFound: another worker dropped it first
+                if e.code != 27:
+                    logger.error("❌ Could not drop index %s on %s: %s", name, collection_name, e)
+                continue
+            logger.info("Dropped superseded index %s on %s", name, collection_name)
+            dropped.append(name)
+    return dropped
+
+async def sync_retention_index(medical_notes) -> None:
+    """Bring an existing ttl_created_at in line with NOTES_RETENTION_DAYS before ensure_indexes runs.
+
+    ensure_indexes skips indexes whose name exists, so a changed retention period would otherwise
+    be ignored, and turning retention off would keep deleting notes.
+    """
+    ttl = (await medical_notes.index_information()).get("ttl_created_at")
+    if ttl is None:
+        return
+    if settings.notes_retention_days <= 0:
+        await medical_notes.drop_index("ttl_created_at")
+        logger.warning("⚠️ Retention disabled: dropped ttl_created_at, medical notes are no longer expired")
+        return
+    seconds = settings.notes_retention_days * 24 * 60 * 60
+    if ttl.get("expireAfterSeconds") != seconds:
+        await medical_notes.database.command(
+            "collMod", medical_notes.name,
+            index={"name": "ttl_created_at", "expireAfterSeconds": seconds}
+        )
+        logger.warning(
+            "⚠️ Retention changed: ttl_created_at now expires notes after %s days",
+            settings.notes_retention_days
+        )
+
+async def ensure_indexes(collection, indexes: List[IndexModel]) -> List[str]:
+    """Create only the named indexes missing from the collection; returns the names created."""
+    existing = await collection.index_information()
+    # A collection holds at most one text index; keep any existing one, whatever it is named
+    has_text = any(TEXT in dict(info["key"]).values() for info in existing.values())
+    missing = [
+        index for index in indexes
+        if index.document["name"] not in existing
+        and not (has_text and TEXT in index.document["key"].values())
+    ]
+    if not missing:
+        return []
+    try:
+        return await collection.create_indexes(missing)
+    except OperationFailure as e:
+        # IndexOptionsConflict / IndexKeySpecsConflict: benign only if another worker created the same indexes
+        if e.code in (85, 86):
+            existing = await collection.index_information()
+            missing = [index for index in missing if index.document["name"] not in existing]
+            if not missing:
+                logger.info("Indexes on %s were created concurrently: %s", collection.name, e)
+                return []
+        logger.warning("⚠️ Batch index creation failed on %s, retrying one by one: %s", collection.name, e)
+
+    # createIndexes rejects the whole batch for one bad spec, so build the rest individually
+    created = []
+    for index in missing:
+        try:
+            created += await collection.create_indexes([index])
+        except OperationFailure as e:
+            logger.error("❌ Could not create index %s on %s: %s", index.document["name"], collection.name, e)
+    return created
@@ -1,27 +1,59 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
-import os
+import asyncio
+import weakref
 
-load_dotenv()
+from app.config import settings
+
+# Connection settings are read once from the Settings singleton (which also loads .env)
+_URL = settings.mongodb_url
+_DB_NAME = settings.mongodb_db_name
+
+# One client per event loop; motor clients are bound to the loop they were created on.
+# Keyed by the loop object, not id(), which a later loop can reuse after this one is closed.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncIOMotorClient]" = weakref.WeakKeyDictionary()
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the shared client for the running event loop, creating it on first use."""
+    # No await between lookup and insert, so concurrent callers on one loop cannot race
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncIOMotorClient(
+            _URL,
+            # Keep a warm pool and throttle concurrent handshakes under bursty load
+            maxPoolSize=settings.mongo_max_pool,
+            minPoolSize=settings.mongo_min_pool,
+            maxIdleTimeMS=300000,
+            maxConnecting=settings.mongo_max_connecting,
+            serverSelectionTimeoutMS=5000,
+            waitQueueTimeoutMS=2000,
+            retryWrites=True
+        )
+        _clients[loop] = client
+    return client
+
+def close_client():
+    """Close and forget the client bound to the running event loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        client.close()
 
 class MongoDB:
-    client: AsyncIOMotorClient = None
-    db = None
+    def __init__(self):
+        self.client = None
+        self.db = None
 
     async def connect_to_mongodb(self):
-        self.client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
-        self.db = self.client[os.getenv("MONGODB_DB_NAME", "rinova")]
-        
-        # Create indexes for better query performance
-        await self.db.medical_notes.create_index("date")
-        await self.db.medical_notes.create_index([("doctor_name", 1)])
-        await self.db.medical_notes.create_index([("patient_name", 1)])
-        
+        self.client = get_client()
+        self.db = self.client[_DB_NAME]
+        # Indexes are created by the app lifespan alongside the startup ping
         print("Connected to MongoDB!")
 
     async def close_mongodb_connection(self):
         if self.client:
-            self.client.close()
+            close_client()
+            self.client = None
+            self.db = None
             print("MongoDB connection closed.")
 
     def get_db(self):
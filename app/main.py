@@ -1,38 +1,104 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-from datetime import datetime, timedelta
-from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 import uvicorn
+import orjson
 import openai
+import asyncio
 import logging
+import time
 import os
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple
 
 from app.routers import code_extraction
+from app.config import settings
+from app.responses import ORJSONResponse, orjson_default
+from app.cache import TTLCache
 from app.database.mongodb import db
+from app.database.indexes import (
+    drop_superseded_indexes, ensure_indexes, medical_notes_indexes, sync_retention_index
+)
+from app.services.openai_service import openai_service
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Logging handlers and format are configured once by app.config.setup_logging
 logger = logging.getLogger(__name__)
 
+# Per-second ISO timestamp cache for response envelopes: [epoch_second, iso_string]
+_ts_cache = [0, ""]
+
+def now_iso() -> str:
+    """Current UTC time as ISO-8601, rebuilt at most once per second"""
+    second = int(time.time())
+    if second != _ts_cache[0]:
+        _ts_cache[0] = second
+        _ts_cache[1] = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return _ts_cache[1]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database connection and create indexes, then clean up on shutdown"""
+    try:
+        await db.connect_to_mongodb()
+        if db.get_db() is None:
+            raise Exception("Database connection failed.")
+        
+        logger.info("✅ Connected to MongoDB!")
+
+        database = db.get_db()
+        medical_notes = database.medical_notes
+        # Ping, index creation and the health probes are independent round-trips
+        await asyncio.gather(
+            db.client.admin.command('ping'),
+            create_indexes(medical_notes),
+            check_system_health(force=True),
+            check_system_health(detailed=True, force=True)
+        )
+        # One-time collection bootstrap and legacy-document repair, kept off the request path
+        await code_extraction.notes_repository.initialize()
+        await code_extraction.notes_repository.repair_missing_fields()
+    except Exception as e:
+        logger.error("❌ Failed to connect to MongoDB: %s", e)
+        raise
+
+    # Keep the health caches warm so /health never probes on the request path
+    app.state.health_task = asyncio.create_task(health_refresher())
+
+    yield
+
+    app.state.health_task.cancel()
+    try:
+        await app.state.health_task
+    except asyncio.CancelledError:
+        pass
+    await db.close_mongodb_connection()
+    logger.info("✅ Disconnected from MongoDB.")
+
 # Create FastAPI app instance
 app = FastAPI(
     title="Rinova API",
     description="Medical code extraction API using OpenAI with enhanced analytics & system monitoring",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Rate Limiting Setup
-limiter = Limiter(key_func=get_remote_address)
+# Rate Limiting Setup; with a redis:// store the moving window is counted by one atomic
+# Lua script per hit (registered once by the limits library), shared across workers
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.rate_limit_store,
+    strategy="moving-window"
+)
+# Only the decorated health endpoints are limited; the decorator enforces limits on its own,
+# so no middleware runs on every other request
 app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
 
 # Add API Routers
 app.include_router(
@@ -40,199 +106,226 @@ app.include_router(
     tags=["Code Extraction"]
 )
 
-# CORS Configuration
-origins = [
-    "https://rinova.netlify.app",
-    "https://rinova-dev.netlify.app",
-    "http://localhost:3000",
-    "http://localhost:5173"
-]
+# CORS Configuration; strip and dedupe once, since " b" from "a, b" never matches an Origin header
+origins = tuple(dict.fromkeys(
+    origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()
+))
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"),
+    # Lowercase up front; Starlette compares requested headers in lowercase
+    allow_headers=("accept", "accept-language", "authorization", "content-type", "origin", "x-requested-with"),
     expose_headers=["Content-Length"],
+    # Browsers cache the preflight for an hour and skip OPTIONS round-trips meanwhile
     max_age=3600,
 )
-# System Health Cache
-system_status_cache = {
-    "last_check": None,
-    "status": None
-}
 
-async def check_system_health() -> Dict[str, Any]:
-    """Comprehensive system health check with MongoDB & OpenAI monitoring"""
-    current_time = datetime.utcnow()
+# Compress larger JSON payloads (extraction results) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
-    if system_status_cache["last_check"] and current_time - system_status_cache["last_check"] < timedelta(minutes=5):
-        return system_status_cache["status"]
+class HealthSnapshot(NamedTuple):
+    status: Dict[str, Any]
+    body: bytes  # status pre-serialized once per refresh
 
-    status = {
-        "status": "online",
-        "timestamp": current_time.isoformat(),
-        "api_version": app.version,
-        "services": {}
-    }
+# System Health Cache, keyed "basic"/"detailed" so the cheap probe never serves the heavy payload
+health_cache = TTLCache(settings.health_cache_ttl, max_keys=2)
+
+# Shared OpenAI client; constructing one per check throws away its connection pool
+_OPENAI_KEY = settings.openai_api_key
+openai_client = (
+    openai.AsyncOpenAI(api_key=_OPENAI_KEY, timeout=settings.openai_healthcheck_timeout, max_retries=0)
+    if _OPENAI_KEY else None
+)
 
-    # MongoDB Health Check
+async def check_mongodb_health(detailed: bool = False) -> Dict[str, Any]:
+    """Ping MongoDB, optionally collecting collection names and data size"""
     try:
         if db.db is None:
             raise Exception("Database connection is None.")
-        
-        await db.client.admin.command('ping')
-        db_stats = await db.db.command("dbStats")
-        collections = await db.db.list_collection_names()
 
-        status["services"]["mongodb"] = {
+        if not detailed:
+            await db.client.admin.command('ping')
+            return {"status": "healthy"}
+
+        # $collStats cannot run inside $facet, so the probes stay as three concurrent commands
+        _, db_stats, collections = await asyncio.gather(
+            db.client.admin.command('ping'),
+            db.db.command("dbStats"),
+            db.db.list_collection_names()
+        )
+        return {
             "status": "healthy",
             "collections": collections,
             "size_mb": round(db_stats["dataSize"] / (1024 * 1024), 2)
         }
     except Exception as e:
-        logger.error(f"❌ MongoDB health check failed: {str(e)}")
-        status["services"]["mongodb"] = {"status": "unhealthy", "error": str(e)}
+        logger.error("❌ MongoDB health check failed: %s", e)
+        return {"status": "unhealthy", "error": str(e)}
+
+async def check_openai_health() -> Dict[str, Any]:
+    """Retrieve the extraction model with the shared client (one cheap call, no model listing)"""
+    if openai_client is None:
+        return {"status": "unhealthy", "error": "Missing API key"}
+    try:
+        await asyncio.wait_for(
+            openai_client.models.retrieve(openai_service.model),
+            timeout=settings.openai_healthcheck_timeout
+        )
+        return {"status": "healthy"}
+    # The SDK's own timeout uses the same bound and may fire before wait_for does
+    except (asyncio.TimeoutError, openai.APITimeoutError):
+        return {"status": "degraded", "error": "OpenAI API did not respond in time"}
+    except Exception as e:
+        logger.error("❌ OpenAI API health check failed: %s", e)
+        return {"status": "unhealthy", "error": str(e)}
+
+async def check_system_health(detailed: bool = False, force: bool = False) -> HealthSnapshot:
+    """System health check; the detailed variant adds MongoDB stats and OpenAI monitoring"""
+    return await health_cache.get(
+        "detailed" if detailed else "basic",
+        lambda: probe_system_health(detailed),
+        force=force
+    )
+
+async def probe_system_health(detailed: bool) -> HealthSnapshot:
+    status = {
+        "status": "online",
+        "timestamp": now_iso(),
+        "api_version": app.version,
+        "services": {}
+    }
 
-    # OpenAI API Check
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-        status["services"]["openai"] = {"status": "unhealthy", "error": "Missing API key"}
+    if detailed:
+        mongodb_status, openai_status = await asyncio.gather(
+            check_mongodb_health(detailed=True),
+            check_openai_health()
+        )
+        status["services"]["mongodb"] = mongodb_status
+        status["services"]["openai"] = openai_status
     else:
-        try:
-            client = openai.OpenAI(api_key=openai_api_key)
-            status["services"]["openai"] = {"status": "healthy"}
-        except Exception as e:
-            logger.error(f"❌ OpenAI API health check failed: {str(e)}")
-            status["services"]["openai"] = {"status": "unhealthy", "error": str(e)}
+        status["services"]["mongodb"] = await check_mongodb_health()
 
-    system_status_cache["last_check"] = current_time
-    system_status_cache["status"] = status
+    return HealthSnapshot(status, orjson.dumps(status))
 
-    return status
+async def health_refresher():
+    """Refresh both health caches every TTL period until cancelled"""
+    while True:
+        await asyncio.sleep(settings.health_cache_ttl)
+        try:
+            await asyncio.gather(
+                check_system_health(force=True),
+                check_system_health(detailed=True, force=True)
+            )
+        except Exception as e:
+            logger.error("❌ Background health refresh failed: %s", e)
 
 async def create_indexes(medical_notes):
-    """Create indexes if they don't exist."""
+    """Create the medical_notes indexes that don't exist yet."""
     try:
         if medical_notes is None:
             raise Exception("Database collection is None.")
-        
-        # Get existing indexes
-        index_cursor = medical_notes.list_indexes()
-        existing_index_names = []
-        async for idx in index_cursor:
-            existing_index_names.append(idx['name'])
-        
-        # Define indexes
-        indexes = []
-
-        if "date_-1" not in existing_index_names:
-            indexes.append(IndexModel([("date", DESCENDING)]))
-
-        if "doctor_name_1" not in existing_index_names:
-            indexes.append(IndexModel([("doctor_name", ASCENDING)]))
 
-        if "patient_name_1" not in existing_index_names:
-            indexes.append(IndexModel([("patient_name", ASCENDING)]))
-
-        if not any("text" in idx_name for idx_name in existing_index_names):
-            indexes.append(IndexModel([("note_text", TEXT)]))
-
-        if "extraction_result.icd10_codes.code_1" not in existing_index_names:
-            indexes.append(IndexModel([("extraction_result.icd10_codes.code", ASCENDING)]))
-
-        if "extraction_result.cpt_codes.code_1" not in existing_index_names:
-            indexes.append(IndexModel([("extraction_result.cpt_codes.code", ASCENDING)]))
-
-        if "extraction_result.hcpcs_codes.code_1" not in existing_index_names:
-            indexes.append(IndexModel([("extraction_result.hcpcs_codes.code", ASCENDING)]))
-
-        if indexes:
-            await medical_notes.create_indexes(indexes)
+        await drop_superseded_indexes(medical_notes.database)
+        await sync_retention_index(medical_notes)
+        if await ensure_indexes(medical_notes, medical_notes_indexes()):
             logger.info("✅ New database indexes created successfully!")
         else:
             logger.info("✅ All required indexes already exist!")
             
     except Exception as e:
-        logger.error(f"❌ Index operation warning: {str(e)}")
-
-@app.on_event("startup")
-async def startup_db_client():
-    """Initialize database connection and create indexes"""
-    try:
-        await db.connect_to_mongodb()
-        if db.get_db() is None:
-            raise Exception("Database connection failed.")
-        
-        logger.info("✅ Connected to MongoDB!")
-
-        database = db.get_db()
-        medical_notes = database.medical_notes
-        await create_indexes(medical_notes)
-
-        await check_system_health()
-    except Exception as e:
-        logger.error(f"❌ Failed to connect to MongoDB: {str(e)}")
-        raise
+        logger.error("❌ Index operation warning: %s", e)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    """Clean up connections on shutdown"""
-    await db.close_mongodb_connection()
-    logger.info("✅ Disconnected from MongoDB.")
+# Pre-serialized root payload, re-encoded only when the per-second timestamp changes
+_root_cache = ["", b""]
 
 @app.get("/", tags=["Health"])
 async def root():
-    return {
-        "status": "success",
-        "message": "Welcome to Rinova API",
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": app.version,
-        "docs": "/docs"
-    }
+    timestamp = now_iso()
+    if timestamp != _root_cache[0]:
+        _root_cache[0] = timestamp
+        _root_cache[1] = orjson.dumps({
+            "status": "success",
+            "message": "Welcome to Rinova API",
+            "timestamp": timestamp,
+            "version": app.version,
+            "docs": "/docs"
+        })
+    return Response(content=_root_cache[1], media_type="application/json")
 
 @app.get("/health", tags=["Health"])
-@limiter.limit("5/minute")
+@limiter.limit(settings.health_rate_limit)
 async def health_check(request: Request):
-    return await check_system_health()
+    snapshot = await check_system_health()
+    return Response(content=snapshot.body, media_type="application/json")
+
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    """Liveness probe: the process is serving requests; touches nothing else"""
+    return Response(status_code=204)
+
+@app.get("/readyz", tags=["Health"])
+async def readyz():
+    """Readiness probe served from the cached basic health body; 503 while MongoDB is down"""
+    snapshot = await check_system_health()
+    ready = snapshot.status["services"]["mongodb"]["status"] == "healthy"
+    return Response(
+        content=snapshot.body,
+        status_code=200 if ready else 503,
+        media_type="application/json"
+    )
+
+@app.get("/health/detailed", tags=["Health"])
+@limiter.limit(settings.health_rate_limit)
+async def detailed_health_check(request: Request):
+    snapshot = await check_system_health(detailed=True)
+    return Response(content=snapshot.body, media_type="application/json")
+
+# Error envelopes as byte templates; values are JSON-encoded with orjson and spliced in
+_RATE_LIMIT_TEMPLATE = (
+    b'{"success":false,"error":{"code":429,"message":"Too many requests",'
+    b'"detail":%b,"timestamp":%b},"data":null}'
+)
+_HTTP_ERROR_TEMPLATE = (
+    b'{"success":false,"error":{"code":%d,"message":%b,"timestamp":%b},"data":null}'
+)
 
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
+    return Response(
         status_code=429,
-        content={
-            "success": False,
-            "error": {
-                "code": 429,
-                "message": "Too many requests",
-                "detail": str(exc),
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            "data": None
-        }
+        content=_RATE_LIMIT_TEMPLATE % (orjson.dumps(str(exc)), orjson.dumps(now_iso())),
+        media_type="application/json"
     )
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return Response(
         status_code=exc.status_code,
-        content={
-            "success": False,
-            "error": {
-                "code": exc.status_code,
-                "message": exc.detail,
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            "data": None
-        }
+        content=_HTTP_ERROR_TEMPLATE % (
+            exc.status_code,
+            orjson.dumps(exc.detail, default=orjson_default),
+            orjson.dumps(now_iso())
+        ),
+        media_type="application/json",
+        headers=getattr(exc, "headers", None)
     )
 
 if __name__ == "__main__":
+    # uvicorn ignores workers when reload is on, so development and production are separate modes.
+    # In production set WORKERS to roughly 2 * CPU cores + 1.
+    dev = settings.environment == "development"
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=int(os.getenv("PORT", "8000")),
-        reload=True,
-        workers=int(os.getenv("WORKERS", "1"))
+        reload=dev,
+        workers=1 if dev else int(os.getenv("WORKERS", "4")),
+        # uvloop has no Windows build, so development keeps "auto"
+        loop="auto" if dev else "uvloop",
+        http="auto" if dev else "httptools",
+        log_level="info",
+        access_log=dev
     )
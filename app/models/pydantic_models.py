@@ -1,30 +1,37 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from pydantic_core import core_schema
+from typing import List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v, handler):
+    def __get_pydantic_core_schema__(cls, source, handler):
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
+
+    @staticmethod
+    def _validate(v):
         if isinstance(v, ObjectId):
             return v
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
+        if isinstance(v, str) and ObjectId.is_valid(v):
+            return ObjectId(v)
+        raise ValueError("Invalid ObjectId")
 
     @classmethod
     def __get_pydantic_json_schema__(cls, core_schema, handler):
         return {"type": "string"}
 
+# The statuses the admin and analytics queries read and write on notes and extraction results
+ExtractionStatusLiteral = Literal["pending", "completed", "failed"]
+
 class BaseCode(BaseModel):
     code: str = Field(..., description="The medical code")
     description: str = Field(..., description="Description of the code")
     confidence_score: float = Field(..., ge=0, le=100, description="Confidence score (0-100%)")
-    suggestions: List[str] = Field(default=[], description="Suggestions for improving documentation")
+    suggestions: List[str] = Field(default_factory=list, description="Suggestions for improving documentation")
 
 class ICD10Code(BaseCode):
     pass
@@ -39,18 +46,18 @@ class Modifier(BaseModel):
     modifier: str = Field(..., description="The modifier code")
     description: str = Field(..., description="Description of the modifier")
     confidence_score: float = Field(..., ge=0, le=100)
-    suggestions: List[str] = Field(default=[])
+    suggestions: List[str] = Field(default_factory=list)
 
 class AlternativeCPT(BaseCode):
     justification: str = Field(..., description="Justification for why this code could apply")
     missing_documentation: List[str] = Field(..., description="Required documentation to support this code")
 
 class CodeExtractionResult(BaseModel):
-    icd10_codes: List[ICD10Code] = Field(default=[], description="Extracted ICD-10 codes")
-    cpt_codes: List[CPTCode] = Field(default=[], description="Extracted CPT codes")
-    alternative_cpts: List[AlternativeCPT] = Field(default=[], description="Potential alternative CPT codes")
-    modifiers: List[Modifier] = Field(default=[], description="Applicable modifiers")
-    hcpcs_codes: List[HCPCSCode] = Field(default=[], description="Extracted HCPCS codes")
+    icd10_codes: List[ICD10Code] = Field(default_factory=list, description="Extracted ICD-10 codes")
+    cpt_codes: List[CPTCode] = Field(default_factory=list, description="Extracted CPT codes")
+    alternative_cpts: List[AlternativeCPT] = Field(default_factory=list, description="Potential alternative CPT codes")
+    modifiers: List[Modifier] = Field(default_factory=list, description="Applicable modifiers")
+    hcpcs_codes: List[HCPCSCode] = Field(default_factory=list, description="Extracted HCPCS codes")
 
 class UpdatedCodes(BaseModel):
     icd10_codes: Optional[List[ICD10Code]] = Field(default=None, description="Final sorted ICD-10 codes")
@@ -73,6 +80,19 @@ class MedicalNote(BaseModel):
     note_text: Optional[str] = Field(default=None)
     extraction_result: Optional[CodeExtractionResult] = None
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "MedicalNote":
+        """Build from a stored medical_notes document.
+
+        The top-level fields are all optional and set as stored, without validation.
+        The extraction result is validated, because stored code items can be incomplete
+        and the response schema requires their fields. Raises ValidationError for them.
+        """
+        extraction_result = data.get("extraction_result")
+        if isinstance(extraction_result, dict):
+            data = {**data, "extraction_result": CodeExtractionResult.model_validate(extraction_result)}
+        return cls.model_construct(**data)
+
 class NoteCreate(BaseModel):
     doctor_name: str
     patient_name: str
@@ -86,15 +106,29 @@ class NoteUpdate(BaseModel):
     date: Optional[datetime] = None
     extraction_result: Optional[CodeExtractionResult] = None
 
+# Read-only response envelopes: never mutated after construction
+RESPONSE_MODEL_CONFIG = ConfigDict(
+    frozen=True,
+    extra="ignore",
+    validate_assignment=False,
+    arbitrary_types_allowed=False
+)
+
 class NoteResponse(BaseModel):
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str
     note: MedicalNote
 
 class NotesListResponse(BaseModel):
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str
     notes: List[MedicalNote]
 
 class ExtractionResponse(BaseModel):
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str
     extraction_result: CodeExtractionResult
 
@@ -103,6 +137,8 @@ class QuickExtractionRequest(BaseModel):
     note_text: str
     
 class QuickExtractionResponse(BaseModel):
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str
     note_id: str
     extraction_result: CodeExtractionResult
@@ -1,7 +1,7 @@
 import logging
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timezone
 from app.models.pydantic_models import (
     MedicalNote,
     NoteCreate,
@@ -14,6 +14,17 @@ from app.database.mongodb import db
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Field names of CodeExtractionResult, read once from the single model definition
+_EXTRACTION_FIELDS = tuple(CodeExtractionResult.model_fields)
+
+def as_object_id(note_id: Union[str, ObjectId]) -> ObjectId:
+    """Parse a note ID once; ObjectIds already validated by the router pass straight through"""
+    return note_id if isinstance(note_id, ObjectId) else ObjectId(note_id)
+
+def empty_extraction_result() -> dict:
+    """A fresh empty extraction_result document"""
+    return {field: [] for field in _EXTRACTION_FIELDS}
+
 
 class MedicalNotesRepository:
     def __init__(self):
@@ -34,83 +45,94 @@ class MedicalNotesRepository:
                 await self.database.create_collection("medical_notes")
             logger.info("✅ Medical notes collection initialized")
 
-    async def get_all_notes(self) -> List[MedicalNote]:
-        """Retrieve all medical notes from the database."""
+    async def iter_all_notes(self) -> AsyncIterator[MedicalNote]:
+        """Yield medical notes one at a time as the cursor delivers them."""
         await self.initialize()
         try:
-            # First repair any documents with missing fields
-            await self.repair_missing_fields()
-            
-            cursor = self.collection.find()
-            notes = []
-            async for document in cursor:
+            async for document in self.collection.find():
                 logger.debug(f"Raw document from DB: {document}")
                 try:
                     # Ensure extraction_result always exists
-                    document.setdefault("extraction_result", {
-                        "icd10_codes": [],
-                        "cpt_codes": [],
-                        "alternative_cpts": [],
-                        "modifiers": [],
-                        "hcpcs_codes": []
-                    })
-                    note = MedicalNote(**document)
-                    notes.append(note)
+                    document.setdefault("extraction_result", empty_extraction_result())
+                    yield MedicalNote.from_trusted(document)
                 except Exception as e:
                     logger.error(f"Error parsing document {document.get('_id')}: {e}")
-            return notes
         except Exception as e:
             logger.error(f"Error retrieving all notes: {e}")
             raise
 
-    async def get_note_by_id(self, note_id: str) -> Optional[MedicalNote]:
+    async def get_all_notes(self) -> List[MedicalNote]:
+        """Retrieve all medical notes from the database."""
+        return [note async for note in self.iter_all_notes()]
+
+    async def get_note_by_id(self, note_id: Union[str, ObjectId]) -> Optional[MedicalNote]:
         """Retrieve a medical note by its ID."""
         await self.initialize()
         try:
-            document = await self.collection.find_one({"_id": ObjectId(note_id)})
+            document = await self.collection.find_one({"_id": as_object_id(note_id)})
             if document:
                 # Ensure extraction_result always exists
-                document.setdefault("extraction_result", {
-                    "icd10_codes": [],
-                    "cpt_codes": [],
-                    "alternative_cpts": [],
-                    "modifiers": [],
-                    "hcpcs_codes": []
-                })
-                return MedicalNote(**document)
+                document.setdefault("extraction_result", empty_extraction_result())
+                return MedicalNote.from_trusted(document)
             return None
         except Exception as e:
             logger.error(f"Error retrieving note with ID {note_id}: {e}")
             return None
 
+    async def get_note_text(self, note_id: Union[str, ObjectId]) -> Optional[str]:
+        """Retrieve only a note's text, or None if the note doesn't exist."""
+        await self.initialize()
+        try:
+            document = await self.collection.find_one(
+                {"_id": as_object_id(note_id)},
+                {"_id": 0, "note_text": 1}
+            )
+            # note_text may be stored as null (PUT allows it); an existing note still has text ""
+            return None if document is None else document.get("note_text") or ""
+        except Exception as e:
+            logger.error(f"Error retrieving text of note {note_id}: {e}")
+            return None
+
+    async def get_notes(self, note_ids: List[Union[str, ObjectId]]) -> List[MedicalNote]:
+        """Retrieve several medical notes in one query, in the order of note_ids; missing IDs are skipped."""
+        await self.initialize()
+        try:
+            object_ids = [as_object_id(note_id) for note_id in note_ids]
+            by_id = {}
+            async for document in self.collection.find({"_id": {"$in": object_ids}}):
+                try:
+                    document.setdefault("extraction_result", empty_extraction_result())
+                    by_id[document["_id"]] = MedicalNote.from_trusted(document)
+                except Exception as e:
+                    logger.error(f"Error parsing document {document.get('_id')}: {e}")
+            return [by_id[object_id] for object_id in object_ids if object_id in by_id]
+        except Exception as e:
+            logger.error(f"Error retrieving notes {note_ids}: {e}")
+            return []
+
     async def create_note(self, note_data: NoteCreate) -> str:
         """Insert a new medical note into the database."""
         await self.initialize()
         try:
             note_dict = note_data.dict()
-            note_dict["created_at"] = datetime.utcnow()
-            note_dict["updated_at"] = datetime.utcnow()
-            note_dict["extraction_result"] = {  # ✅ Ensure extraction_result exists
-                "icd10_codes": [],
-                "cpt_codes": [],
-                "alternative_cpts": [],
-                "modifiers": [],
-                "hcpcs_codes": []
-            }
+            now = datetime.now(timezone.utc)
+            note_dict["created_at"] = now
+            note_dict["updated_at"] = now
+            note_dict["extraction_result"] = empty_extraction_result()  # ✅ Ensure extraction_result exists
             result = await self.collection.insert_one(note_dict)
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error creating note: {e}")
             raise
 
-    async def update_note(self, note_id: str, update_data: NoteUpdate) -> bool:
+    async def update_note(self, note_id: Union[str, ObjectId], update_data: NoteUpdate) -> bool:
         """Update an existing medical note."""
         await self.initialize()
         try:
             update_dict = {k: v for k, v in update_data.dict(exclude_unset=True).items()}
-            update_dict["updated_at"] = datetime.utcnow()
+            update_dict["updated_at"] = datetime.now(timezone.utc)
             result = await self.collection.update_one(
-                {"_id": ObjectId(note_id)},
+                {"_id": as_object_id(note_id)},
                 {"$set": update_dict}
             )
             return result.modified_count > 0
@@ -118,23 +140,23 @@ class MedicalNotesRepository:
             logger.error(f"Error updating note {note_id}: {e}")
             return False
 
-    async def delete_note(self, note_id: str) -> bool:
+    async def delete_note(self, note_id: Union[str, ObjectId]) -> bool:
         """Delete a medical note by its ID."""
         await self.initialize()
         try:
-            result = await self.collection.delete_one({"_id": ObjectId(note_id)})
+            result = await self.collection.delete_one({"_id": as_object_id(note_id)})
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error deleting note {note_id}: {e}")
             return False
 
-    async def extract_codes_for_note(self, note_id: str, extraction_result: CodeExtractionResult) -> bool:
+    async def extract_codes_for_note(self, note_id: Union[str, ObjectId], extraction_result: CodeExtractionResult) -> bool:
         """Attach extracted ICD codes to a medical note."""
         await self.initialize()
         try:
             result = await self.collection.update_one(
-                {"_id": ObjectId(note_id)},
-                {"$set": {"extraction_result": extraction_result.dict(), "updated_at": datetime.utcnow()}}
+                {"_id": as_object_id(note_id)},
+                {"$set": {"extraction_result": extraction_result.dict(), "updated_at": datetime.now(timezone.utc)}}
             )
             return result.modified_count > 0
         except Exception as e:
@@ -150,14 +172,8 @@ class MedicalNotesRepository:
                     "doctor_name": "Unknown",
                     "patient_name": "Unknown",
                     "note_text": "",
-                    "date": datetime.utcnow(),
-                    "extraction_result": {
-                        "icd10_codes": [],
-                        "cpt_codes": [],
-                        "alternative_cpts": [],
-                        "modifiers": [],
-                        "hcpcs_codes": []
-                    }
+                    "date": datetime.now(timezone.utc),
+                    "extraction_result": empty_extraction_result()
                 }
             }
             
@@ -0,0 +1,33 @@
+from fastapi import Response
+from fastapi.responses import ORJSONResponse as _BaseORJSONResponse
+from pydantic_core import to_json
+from bson import ObjectId
+from typing import Any
+import orjson
+
+def orjson_default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively (Mongo ObjectIds)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+class ORJSONResponse(_BaseORJSONResponse):
+    """ORJSONResponse that also stringifies ObjectId values"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+
+class PydanticJSONResponse(Response):
+    """Serializes a pydantic model straight to JSON bytes with pydantic-core.
+
+    Returning this from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass, so only use it for models built from trusted data.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, by_alias=True)
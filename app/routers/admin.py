@@ -1,55 +1,70 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+from datetime import datetime, timedelta, timezone
 from ..database.mongodb import get_database
-from ..models.pydantic_models import ExtractionStatus, MedicalNote
-from ..core.config import Settings
+from ..database.indexes import (
+    drop_superseded_indexes, ensure_indexes, medical_notes_indexes, sync_retention_index
+)
+from ..responses import ORJSONResponse
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+async def _compute_system_stats() -> Dict[str, Any]:
+    db = get_database()
+    current_time = datetime.now(timezone.utc)
+    last_24h = current_time - timedelta(hours=24)
+    last_7d = current_time - timedelta(days=7)
+    
+    # Window counts are range queries on created_at, so they stay index-backed: indexed
+    # count_documents on notes, and a $match ahead of the $facet for extractions ($facet
+    # sub-pipelines cannot use indexes). Unfiltered totals come from collection metadata.
+    status_pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    extractions_pipeline = [
+        {"$match": {"created_at": {"$gte": last_7d}}},
+        {"$facet": {
+            "last_24h": [{"$match": {"created_at": {"$gte": last_24h}}}, {"$count": "n"}],
+            "last_7d": [{"$count": "n"}],
+        }}
+    ]
+
+    (
+        total_notes, total_extractions, notes_last_24h, notes_last_7d,
+        status_counts, (extraction_facets,)
+    ) = await asyncio.gather(
+        db.medical_notes.estimated_document_count(),
+        db.extraction_results.estimated_document_count(),
+        db.medical_notes.count_documents({"created_at": {"$gte": last_24h}}),
+        db.medical_notes.count_documents({"created_at": {"$gte": last_7d}}),
+        db.medical_notes.aggregate(status_pipeline).to_list(None),
+        db.extraction_results.aggregate(extractions_pipeline).to_list(1)
+    )
+
+    def facet_count(facets: Dict[str, Any], key: str) -> int:
+        return facets[key][0]["n"] if facets[key] else 0
+
+    stats = {
+        "total_notes": total_notes,
+        "total_extractions": total_extractions,
+        "last_24h": {
+            "notes_added": notes_last_24h,
+            "extractions_performed": facet_count(extraction_facets, "last_24h")
+        },
+        "last_7d": {
+            "notes_added": notes_last_7d,
+            "extractions_performed": facet_count(extraction_facets, "last_7d")
+        },
+        "status_counts": {doc["_id"]: doc["count"] for doc in status_counts}
+    }
+    return stats
+
 @router.get("/system/stats")
 async def get_system_stats():
     """
     Get system-wide statistics and performance metrics.
     """
-    db = get_database()
-    
     try:
-        current_time = datetime.utcnow()
-        last_24h = current_time - timedelta(hours=24)
-        last_7d = current_time - timedelta(days=7)
-        
-        # Gather system statistics
-        stats = {
-            "total_notes": await db.medical_notes.count_documents({}),
-            "total_extractions": await db.extraction_results.count_documents({}),
-            "last_24h": {
-                "notes_added": await db.medical_notes.count_documents(
-                    {"created_at": {"$gte": last_24h}}
-                ),
-                "extractions_performed": await db.extraction_results.count_documents(
-                    {"created_at": {"$gte": last_24h}}
-                )
-            },
-            "last_7d": {
-                "notes_added": await db.medical_notes.count_documents(
-                    {"created_at": {"$gte": last_7d}}
-                ),
-                "extractions_performed": await db.extraction_results.count_documents(
-                    {"created_at": {"$gte": last_7d}}
-                )
-            },
-            "status_counts": {}
-        }
-        
-        # Get counts by status
-        pipeline = [
-            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-        ]
-        status_counts = await db.medical_notes.aggregate(pipeline).to_list(None)
-        stats["status_counts"] = {doc["_id"]: doc["count"] for doc in status_counts}
-        
-        return {"success": True, "data": stats}
+        return ORJSONResponse({"success": True, "data": await _compute_system_stats()})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching system stats: {str(e)}")
@@ -64,7 +79,7 @@ async def get_performance_metrics(
     db = get_database()
     
     try:
-        current_time = datetime.utcnow()
+        current_time = datetime.now(timezone.utc)
         if timeframe == "24h":
             start_time = current_time - timedelta(hours=24)
         elif timeframe == "7d":
@@ -95,12 +110,12 @@ async def get_performance_metrics(
         
         metrics = await db.extraction_results.aggregate(pipeline).to_list(1)
         if not metrics:
-            return {"success": True, "data": {"message": "No data for the specified timeframe"}}
+            return ORJSONResponse({"success": True, "data": {"message": "No data for the specified timeframe"}})
             
         metrics = metrics[0]
         metrics["success_rate"] = (metrics["success_count"] / metrics["total_extractions"]) * 100
         
-        return {"success": True, "data": metrics}
+        return ORJSONResponse({"success": True, "data": metrics})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching performance metrics: {str(e)}")
@@ -115,7 +130,7 @@ async def cleanup_old_records(
     db = get_database()
     
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
         # Delete old records but keep successful extractions
         delete_result = await db.medical_notes.delete_many({
@@ -123,13 +138,13 @@ async def cleanup_old_records(
             "status": {"$in": ["failed", "pending"]}
         })
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "deleted_count": delete_result.deleted_count,
                 "cutoff_date": cutoff_date.isoformat()
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during cleanup: {str(e)}")
@@ -144,9 +159,9 @@ async def reprocess_failed_extractions(
     db = get_database()
     
     try:
-        # Find failed extractions
+        # Find failed extractions; only their IDs are needed, so leave the note bodies in Mongo
         failed_notes = await db.medical_notes.find(
-            {"status": "failed"}
+            {"status": "failed"}, {"_id": 1}
         ).limit(max_items).to_list(None)
         
         # Update status to pending for reprocessing
@@ -155,16 +170,16 @@ async def reprocess_failed_extractions(
         if note_ids:
             await db.medical_notes.update_many(
                 {"_id": {"$in": note_ids}},
-                {"$set": {"status": "pending", "updated_at": datetime.utcnow()}}
+                {"$set": {"status": "pending", "updated_at": datetime.now(timezone.utc)}}
             )
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "reprocessing_count": len(note_ids),
                 "note_ids": note_ids
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during reprocessing: {str(e)}")
@@ -184,7 +199,7 @@ async def get_queue_status():
                     "count": {"$sum": 1},
                     "avg_wait_time": {
                         "$avg": {
-                            "$subtract": [datetime.utcnow(), "$created_at"]
+                            "$subtract": [datetime.now(timezone.utc), "$created_at"]
                         }
                     }
                 }
@@ -202,7 +217,7 @@ async def get_queue_status():
                 if stat["avg_wait_time"] else 0
             }
             
-        return {"success": True, "data": status_stats}
+        return ORJSONResponse({"success": True, "data": status_stats})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching queue status: {str(e)}")
@@ -215,16 +230,15 @@ async def optimize_database():
     db = get_database()
     
     try:
-        # Create/update indexes
-        await db.medical_notes.create_index([("created_at", -1)])
-        await db.medical_notes.create_index([("status", 1)])
-        await db.medical_notes.create_index([("patient_id", 1)])
-        await db.medical_notes.create_index([("content", "text")])
+        # Same index maintenance as startup: drop replaced indexes, create whatever is missing
+        await drop_superseded_indexes(db)
+        await sync_retention_index(db.medical_notes)
+        await ensure_indexes(db.medical_notes, medical_notes_indexes())
         
         # Run database stats
         db_stats = await db.command("dbStats")
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "message": "Database optimization completed",
@@ -234,7 +248,7 @@ async def optimize_database():
                     "size_mb": round(db_stats["dataSize"] / (1024 * 1024), 2)
                 }
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during optimization: {str(e)}")
\ No newline at end of file
@@ -1,53 +1,55 @@
 from fastapi import APIRouter, Query, HTTPException
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import Dict, Any
+from datetime import datetime, timedelta, timezone
 from ..database.mongodb import get_database
+from ..responses import ORJSONResponse
+from ..cache import TTLCache
+from ..config import settings
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 
+# Recent extraction-stats results keyed by days
+_stats_cache = TTLCache(settings.analytics_cache_ttl, max_keys=64)
+
+async def _compute_extraction_statistics(days: int) -> Dict[str, Any]:
+    db = get_database()
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+
+    # Totals, successes and mean processing time in one pass over the window
+    # ($avg skips documents without a numeric processing_time)
+    pipeline = [
+        {"$match": {"created_at": {"$gte": start_date}}},
+        {
+            "$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "completed": {
+                    "$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}
+                },
+                "avg_processing_time": {"$avg": "$processing_time"}
+            }
+        }
+    ]
+    summary = await db.extraction_results.aggregate(pipeline).to_list(1)
+    summary = summary[0] if summary else {}
+    total_extractions = summary.get("total", 0)
+    success_count = summary.get("completed", 0)
+    avg_processing_time = summary.get("avg_processing_time") or 0
+
+    return {
+        "total_extractions": total_extractions,
+        "success_rate": (success_count / total_extractions * 100) if total_extractions > 0 else 0,
+        "avg_processing_time": avg_processing_time,
+        "period_days": days
+    }
+
 @router.get("/extraction-stats")
 async def get_extraction_statistics(
-    days: int = Query(30, description="Number of days to analyze")
+    days: int = Query(30, ge=1, le=365, description="Number of days to analyze")
 ):
-    db = get_database()
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
     try:
-        # Get total counts
-        total_extractions = await db.extraction_results.count_documents({
-            "created_at": {"$gte": start_date}
-        })
-        
-        # Get success rate
-        success_count = await db.extraction_results.count_documents({
-            "created_at": {"$gte": start_date},
-            "status": "completed"
-        })
-        
-        # Calculate average processing time
-        pipeline = [
-            {
-                "$match": {
-                    "created_at": {"$gte": start_date},
-                    "processing_time": {"$exists": True}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "avg_processing_time": {"$avg": "$processing_time"}
-                }
-            }
-        ]
-        avg_time_result = await db.extraction_results.aggregate(pipeline).to_list(1)
-        avg_processing_time = avg_time_result[0]["avg_processing_time"] if avg_time_result else 0
-        
-        return {
-            "total_extractions": total_extractions,
-            "success_rate": (success_count / total_extractions * 100) if total_extractions > 0 else 0,
-            "avg_processing_time": avg_processing_time,
-            "period_days": days
-        }
+        stats = await _stats_cache.get(days, lambda: _compute_extraction_statistics(days))
+        return ORJSONResponse(stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -57,7 +59,7 @@ async def get_common_codes(
     days: int = Query(30, description="Number of days to analyze")
 ):
     db = get_database()
-    start_date = datetime.utcnow() - timedelta(days=days)
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
     
     try:
         pipeline = [
@@ -67,6 +69,8 @@ async def get_common_codes(
                     "extracted_codes": {"$exists": True}
                 }
             },
+            # Drop everything but the code pairs before fanning out
+            {"$project": {"_id": 0, "extracted_codes.code": 1, "extracted_codes.description": 1}},
             {"$unwind": "$extracted_codes"},
             {
                 "$group": {
@@ -80,6 +84,6 @@ async def get_common_codes(
         ]
         
         results = await db.extraction_results.aggregate(pipeline).to_list(limit)
-        return results
+        return ORJSONResponse(results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,11 +1,9 @@
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
 from bson import ObjectId
-from bson.errors import InvalidId
 from datetime import datetime
 
 from app.models.pydantic_models import (
-    MedicalNote,
     NoteCreate,
     NoteUpdate,
     NoteResponse,
@@ -17,40 +15,49 @@ from app.models.pydantic_models import (
     UpdatedCodes
 )
 from app.services.openai_service import openai_service
+from app.responses import PydanticJSONResponse
 from app.repositories.medical_notes import MedicalNotesRepository
 
 router = APIRouter(prefix="/api/v1", tags=["Code Extraction"])
 
-# Lazy initialization of repository
+# Shared repository; the app lifespan initializes it and repairs legacy documents once at startup
 notes_repository = MedicalNotesRepository()
 
 async def get_repository():
     """Ensure repository is initialized before use."""
     await notes_repository.initialize()
-    try:
-        await notes_repository.repair_missing_fields()  # Add this method
-    except Exception as e:
-        print(f"Error repairing fields: {e}")
     return notes_repository
 
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+@lru_cache(maxsize=4096)
+def _parse_object_id(id: str) -> ObjectId:
+    # Only reached with well-formed IDs, so invalid input never fills the cache
+    return ObjectId(id)
+
 def validate_object_id(id: str) -> ObjectId:
     """Validate and convert string ID to ObjectId."""
-    try:
-        return ObjectId(id)
-    except InvalidId:
+    if len(id) != 24 or not _HEX_DIGITS.issuperset(id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid note ID format: {id}"
         )
+    return _parse_object_id(id)
+
+# Response envelopes wrap models that were already validated on the way in from the
+# repository or OpenAI service, so they are built with model_construct to skip revalidation
+# and serialized directly by pydantic-core; response_model still documents the schema
 
 @router.get("/notes", response_model=NotesListResponse)
 async def get_all_notes(repository: MedicalNotesRepository = Depends(get_repository)):
     """Get all medical notes with their extracted codes."""
     try:
         notes = await repository.get_all_notes()
-        return NotesListResponse(
-            message="Notes retrieved successfully",
-            notes=notes
+        return PydanticJSONResponse(
+            NotesListResponse.model_construct(
+                message="Notes retrieved successfully",
+                notes=notes
+            )
         )
     except Exception as e:
         raise HTTPException(
@@ -66,7 +73,7 @@ async def get_note(
     """Get a specific medical note by ID."""
     try:
         object_id = validate_object_id(note_id)
-        note = await repository.get_note_by_id(str(object_id))
+        note = await repository.get_note_by_id(object_id)
         if not note:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,17 +82,13 @@ async def get_note(
 
         # Ensure extraction_result always exists
         if note.extraction_result is None:
-            note.extraction_result = {
-                "icd10_codes": [],
-                "cpt_codes": [],
-                "alternative_cpts": [],
-                "modifiers": [],
-                "hcpcs_codes": []
-            }
+            note.extraction_result = CodeExtractionResult()
 
-        return NoteResponse(
-            message="Note retrieved successfully",
-            note=note
+        return PydanticJSONResponse(
+            NoteResponse.model_construct(
+                message="Note retrieved successfully",
+                note=note
+            )
         )
     except HTTPException:
         raise
@@ -104,10 +107,21 @@ async def create_note(
     try:
         new_note_id = await repository.create_note(note)
         new_note = await repository.get_note_by_id(new_note_id)
-        return NoteResponse(
-            message="Note created successfully",
-            note=new_note
+        # PydanticJSONResponse skips response_model validation, so never send a null note
+        if new_note is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create note: note {new_note_id} could not be read back"
+            )
+        return PydanticJSONResponse(
+            NoteResponse.model_construct(
+                message="Note created successfully",
+                note=new_note
+            ),
+            status_code=status.HTTP_201_CREATED
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -123,16 +137,23 @@ async def update_note(
     """Update an existing medical note."""
     try:
         object_id = validate_object_id(note_id)
-        updated = await repository.update_note(str(object_id), note_update)
+        updated = await repository.update_note(object_id, note_update)
         if not updated:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Note with ID {note_id} not found"
             )
-        updated_note = await repository.get_note_by_id(str(object_id))
-        return NoteResponse(
-            message="Note updated successfully",
-            note=updated_note
+        updated_note = await repository.get_note_by_id(object_id)
+        if updated_note is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Note with ID {note_id} not found"
+            )
+        return PydanticJSONResponse(
+            NoteResponse.model_construct(
+                message="Note updated successfully",
+                note=updated_note
+            )
         )
     except HTTPException:
         raise
@@ -151,24 +172,26 @@ async def extract_codes(
     try:
         object_id = validate_object_id(note_id)
 
-        # Get the note
-        note = await repository.get_note_by_id(str(object_id))
-        if not note:
+        # Only the text is needed; leave the stored extraction result in Mongo
+        note_text = await repository.get_note_text(object_id)
+        if note_text is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Note with ID {note_id} not found"
             )
 
         # Extract codes using OpenAI
-        extraction_result = await openai_service.extract_codes(note.note_text)
+        extraction_result = await openai_service.extract_codes(note_text)
 
         # Update note with extracted codes
         note_update = NoteUpdate(extraction_result=extraction_result)
-        await repository.update_note(str(object_id), note_update)
+        await repository.update_note(object_id, note_update)
 
-        return ExtractionResponse(
-            message="Codes extracted successfully",
-            extraction_result=extraction_result
+        return PydanticJSONResponse(
+            ExtractionResponse.model_construct(
+                message="Codes extracted successfully",
+                extraction_result=extraction_result
+            )
         )
 
     except HTTPException:
@@ -204,10 +227,12 @@ async def quick_extract(
         note_update = NoteUpdate(extraction_result=extraction_result)
         await repository.update_note(new_note_id, note_update)
 
-        return QuickExtractionResponse(
-            message="Codes extracted successfully",
-            note_id=new_note_id,
-            extraction_result=extraction_result
+        return PydanticJSONResponse(
+            QuickExtractionResponse.model_construct(
+                message="Codes extracted successfully",
+                note_id=new_note_id,
+                extraction_result=extraction_result
+            )
         )
     except Exception as e:
         raise HTTPException(
@@ -226,7 +251,7 @@ async def save_sorted_codes(
         object_id = validate_object_id(note_id)
         
         # Get the existing note
-        note = await repository.get_note_by_id(str(object_id))
+        note = await repository.get_note_by_id(object_id)
         if not note:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -245,17 +270,24 @@ async def save_sorted_codes(
         )
         
         # Update the note
-        updated = await repository.update_note(str(object_id), note_update)
+        updated = await repository.update_note(object_id, note_update)
         if not updated:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to update codes"
             )
         # Return updated note
-        updated_note = await repository.get_note_by_id(str(object_id))
-        return NoteResponse(
-            message="Codes sorted and saved successfully",
-            note=updated_note
+        updated_note = await repository.get_note_by_id(object_id)
+        if updated_note is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Note with ID {note_id} not found"
+            )
+        return PydanticJSONResponse(
+            NoteResponse.model_construct(
+                message="Codes sorted and saved successfully",
+                note=updated_note
+            )
         )
     except HTTPException:
         raise
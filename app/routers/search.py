@@ -1,19 +1,48 @@
+import asyncio
 from fastapi import APIRouter, Query, HTTPException
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
 from ..database.mongodb import db  # Using your existing db import
+from ..responses import ORJSONResponse
+from ..models.pydantic_models import ExtractionStatusLiteral
 from pymongo import DESCENDING
 
 router = APIRouter(prefix="/api/v1/search", tags=["search"])
 
+# Newest first; _id breaks created_at ties so keyset cursors are unambiguous
+_PAGE_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+def keyset_filter(after: str) -> Dict[str, Any]:
+    """Filter for the documents that sort after an `after` cursor ("<created_at ISO>,<_id>")"""
+    created_at, _, object_id = after.rpartition(",")
+    try:
+        created_at = datetime.fromisoformat(created_at)
+        object_id = ObjectId(object_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail=f"Invalid after cursor: {after}")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": object_id}}
+    ]}
+
+def next_cursor(documents: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Cursor for the page following a full page, None once the results run out"""
+    if len(documents) < limit or documents[-1].get("created_at") is None:
+        return None
+    last = documents[-1]
+    return f"{last['created_at'].isoformat()},{last['_id']}"
+
 @router.get("/notes")
 async def search_medical_notes(
     query: str = Query(None, description="Text search query"),
     start_date: datetime = Query(None, description="Start date for filtering"),
     end_date: datetime = Query(None, description="End date for filtering"),
-    status: str = Query(None, description="Extraction status"),
+    status: Optional[ExtractionStatusLiteral] = Query(None, description="Extraction status"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="next_after cursor from the previous page; replaces skip")
 ):
     try:
         # Build query filter
@@ -28,28 +57,34 @@ async def search_medical_notes(
         if status:
             filter_query["status"] = status
             
-        # Get total count for pagination
-        total_count = await db.client[db.db_name]["medical_notes"].count_documents(filter_query)
-        
-        # Get paginated results
-        cursor = db.client[db.db_name]["medical_notes"].find(
-            filter_query
-        ).sort("created_at", DESCENDING).skip(skip).limit(limit)
+        # Keyset pagination seeks straight to the page; skip walks every earlier document
+        page_query = {**filter_query, **keyset_filter(after)} if after else filter_query
+        collection = db.get_db()["medical_notes"]
+        cursor = collection.find(
+            page_query
+        ).sort(_PAGE_SORT).skip(0 if after else skip).limit(limit).batch_size(limit)
         
-        notes = await cursor.to_list(length=limit)
+        # Total count and the page are independent queries; run them concurrently
+        total_count, notes = await asyncio.gather(
+            collection.count_documents(filter_query),
+            cursor.to_list(length=limit)
+        )
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "total": total_count,
                 "notes": notes,
                 "page": {
-                    "current": skip // limit + 1,
+                    "current": None if after else skip // limit + 1,
                     "size": limit,
-                    "total_pages": (total_count + limit - 1) // limit
+                    "total_pages": (total_count + limit - 1) // limit,
+                    "next_after": next_cursor(notes, limit)
                 }
             }
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -59,7 +94,8 @@ async def search_extractions(
     start_date: datetime = Query(None, description="Start date for filtering"),
     end_date: datetime = Query(None, description="End date for filtering"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="next_after cursor from the previous page; replaces skip")
 ):
     try:
         # Build query filter
@@ -72,27 +108,33 @@ async def search_extractions(
                 "$lte": end_date
             }
             
-        # Get total count
-        total_count = await db.client[db.db_name]["extraction_results"].count_documents(filter_query)
-        
-        # Get paginated results
-        cursor = db.client[db.db_name]["extraction_results"].find(
-            filter_query
-        ).sort("created_at", DESCENDING).skip(skip).limit(limit)
+        # Keyset pagination seeks straight to the page; skip walks every earlier document
+        page_query = {**filter_query, **keyset_filter(after)} if after else filter_query
+        collection = db.get_db()["extraction_results"]
+        cursor = collection.find(
+            page_query
+        ).sort(_PAGE_SORT).skip(0 if after else skip).limit(limit).batch_size(limit)
         
-        extractions = await cursor.to_list(length=limit)
+        # Total count and the page are independent queries; run them concurrently
+        total_count, extractions = await asyncio.gather(
+            collection.count_documents(filter_query),
+            cursor.to_list(length=limit)
+        )
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "total": total_count,
                 "extractions": extractions,
                 "page": {
-                    "current": skip // limit + 1,
+                    "current": None if after else skip // limit + 1,
                     "size": limit,
-                    "total_pages": (total_count + limit - 1) // limit
+                    "total_pages": (total_count + limit - 1) // limit,
+                    "next_after": next_cursor(extractions, limit)
                 }
             }
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
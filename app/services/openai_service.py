@@ -1,16 +1,8 @@
 import logging
 from openai import OpenAI
-import json
-from typing import Dict, Any
+from pydantic import ValidationError
 from app.config import settings
-from app.models.pydantic_models import (
-    CodeExtractionResult,
-    ICD10Code,
-    CPTCode,
-    HCPCSCode,
-    Modifier,
-    AlternativeCPT
-)
+from app.models.pydantic_models import CodeExtractionResult
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,7 +10,7 @@ logger.setLevel(logging.INFO)
 
 class OpenAIService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=settings.openai_api_key)
         self.model = "gpt-4o-2024-08-06"
 
     async def extract_codes(self, note_text: str) -> CodeExtractionResult:
@@ -119,19 +111,10 @@ Your response must be valid JSON matching this exact structure:
             logger.info("Received response from OpenAI")
             logger.debug(f"Raw OpenAI response: {response}")
 
-            # Parse the JSON response
+            # Parse and validate the JSON response in one pydantic-core pass
             try:
-                extraction_data = json.loads(response)
+                result = CodeExtractionResult.model_validate_json(response)
                 logger.info("Successfully parsed JSON response")
-                logger.debug(f"Parsed extraction data: {json.dumps(extraction_data, indent=2)}")
-
-                result = CodeExtractionResult(
-                    icd10_codes=[ICD10Code(**code) for code in extraction_data.get("icd10_codes", [])],
-                    cpt_codes=[CPTCode(**code) for code in extraction_data.get("cpt_codes", [])],
-                    alternative_cpts=[AlternativeCPT(**code) for code in extraction_data.get("alternative_cpts", [])],
-                    modifiers=[Modifier(**mod) for mod in extraction_data.get("modifiers", [])],
-                    hcpcs_codes=[HCPCSCode(**code) for code in extraction_data.get("hcpcs_codes", [])]
-                )
 
                 logger.info(f"Extracted {len(result.icd10_codes)} ICD-10 codes, "
                           f"{len(result.cpt_codes)} CPT codes, "
@@ -141,14 +124,14 @@ Your response must be valid JSON matching this exact structure:
 
                 return result
 
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing error: {e}")
-                logger.error(f"Raw response that failed parsing: {response}")
-                raise ValueError("Failed to parse OpenAI response as JSON")
+            except ValidationError as e:
+                if any(error["type"] == "json_invalid" for error in e.errors()):
+                    logger.error(f"JSON parsing error: {e}")
+                    logger.error(f"Raw response that failed parsing: {response}")
+                    raise ValueError("Failed to parse OpenAI response as JSON")
 
-            except Exception as e:
                 logger.error(f"Error processing response: {str(e)}")
-                logger.error(f"Extraction data that caused error: {json.dumps(extraction_data, indent=2) if 'extraction_data' in locals() else 'Not available'}")
+                logger.error(f"Extraction data that caused error: {response}")
                 raise ValueError(f"Failed to process OpenAI response: {str(e)}")
 
         except Exception as e:
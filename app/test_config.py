@@ -1,4 +1,4 @@
-from config import get_settings
+from app.config import get_settings
 
 settings = get_settings()
 print(f"Environment: {settings.environment}")